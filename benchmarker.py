@@ -1,78 +1,106 @@
-from game import Game
-from lp import LinearProgrammingSolver
-from sr import SwapRegretSolver
-import numpy as np
-from tester import benchmark_solvers, social_welfare
-
-def log_results(nplayers, nactions, file_path, include_sr=True):
-    game = Game(nplayers, [nactions] * nplayers, game_type=Game.RANDOM)
-
-    lp_solver = LinearProgrammingSolver(game)
-    lp_welfare_solver = LinearProgrammingSolver(game, maximize_welfare=True)
-    
-    if include_sr:
-        sr_solver = SwapRegretSolver(game, epsilon=0.1)
-        solvers = [lp_solver, lp_welfare_solver, sr_solver]
-    else:
-        solvers = [lp_solver, lp_welfare_solver]
-
-    results = benchmark_solvers(game, solvers, social_welfare)
-
-    with open(file_path, "a") as f:
-        for solver, result in results.items():
-            max_violation = max([v["magnitude"] for v in result["violations"]]) if result["violations"] else 0
-            n_violations = len(result["violations"])
-            welfare = result["welfare"]
-            runtime = result["runtime"]
-            f.write(f"{nplayers},{nactions},{solver},{runtime},{max_violation},{n_violations},{welfare}\n")
-
-def lp_benchmark():
-    nplayers_arr = [2, 4, 7, 10]
-    nactions_arr = [2, 10, 25, 50]
-
-    file_path = "logs/lp_benchmarking.csv"
-    with open(file_path, "w") as f:
-        f.write("NPlayers,MaxNActions,Solver,Runtime,MaxViolation,NViolations,Welfare\n")
-    
-    for nplayers in nplayers_arr:
-        nactions = 2
-        print(f"Benchmarking for {nplayers} players and {nactions} actions...")
-
-        for i in range(10):
-            log_results(nplayers, nactions, file_path, include_sr=False)
-
-    for nactions in nactions_arr:
-        nplayers = 2
-        print(f"Benchmarking for {nplayers} players and {nactions} actions...")
-
-        for i in range(10):
-            log_results(nplayers, nactions, file_path, include_sr=False)
-
-    print(f"Benchmarking complete. Results logged to {file_path}.")
-
-def sr_benchmark():
-    nplayers_arr = [2, 3, 4, 5]
-    nactions_arr = [2, 3, 4, 5]
-
-    file_path = "logs/sr_benchmarking.csv"
-    with open(file_path, "w") as f:
-        f.write("NPlayers,MaxNActions,Solver,Runtime,MaxViolation,NViolations,Welfare\n")
-    
-    for nplayers in nplayers_arr:
-        nactions = 2
-        print(f"Benchmarking for {nplayers} players and {nactions} actions...")
-
-        for i in range(5):
-            log_results(nplayers, nactions, file_path)
-    
-    for nactions in nactions_arr:
-        nplayers = 2
-        print(f"Benchmarking for {nplayers} players and {nactions} actions...")
-
-        for i in range(5):
-            log_results(nplayers, nactions, file_path)
-
-    print(f"Benchmarking complete. Results logged to {file_path}.")
-
-if __name__ == "__main__":
-    sr_benchmark()
\ No newline at end of file
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game import Game
+from lp import LinearProgrammingSolver
+from sr import SwapRegretSolver
+from tester import benchmark_solvers, social_welfare
+
+def benchmark_rows(nplayers, nactions, include_sr=True, seed=None):
+    """
+    Run all solvers on one random game and return the CSV rows to log.
+
+    Parameters:
+    - nplayers (int): Number of players in the generated game.
+    - nactions (int): Number of actions per player.
+    - include_sr (bool): Whether to also run the swap regret solver.
+    - seed (int): Optional seed, so parallel workers generate reproducible,
+      non-identical games and sampling runs.
+    """
+    rng = np.random.default_rng(seed) if seed is not None else None
+    game = Game(nplayers, [nactions] * nplayers, game_type=Game.RANDOM, rng=rng)
+
+    lp_solver = LinearProgrammingSolver(game)
+    lp_welfare_solver = LinearProgrammingSolver(game, maximize_welfare=True)
+
+    if include_sr:
+        sr_solver = SwapRegretSolver(game, epsilon=0.1, seed=seed)
+        solvers = [lp_solver, lp_welfare_solver, sr_solver]
+    else:
+        solvers = [lp_solver, lp_welfare_solver]
+
+    results = benchmark_solvers(game, solvers, social_welfare)
+
+    rows = []
+    for solver, result in results.items():
+        violations = result["violations"]
+        # Structured array: take the magnitude column directly. len() rather
+        # than truthiness, which is ambiguous for arrays.
+        max_violation = float(violations["magnitude"].max()) if len(violations) else 0
+        n_violations = len(violations)
+        welfare = result["welfare"]
+        runtime = result["runtime"]
+        rows.append(f"{nplayers},{nactions},{solver},{runtime},{max_violation},{n_violations},{welfare}\n")
+    return rows
+
+def log_results(nplayers, nactions, f, include_sr=True):
+    for row in benchmark_rows(nplayers, nactions, include_sr=include_sr):
+        f.write(row)
+
+def _run_job(job):
+    nplayers, nactions, include_sr, seed = job
+    return benchmark_rows(nplayers, nactions, include_sr=include_sr, seed=seed)
+
+def run_benchmark(jobs, file_path):
+    """
+    Run independent benchmark configurations in parallel and log the results.
+
+    Parameters:
+    - jobs (list[tuple]): (nplayers, nactions, include_sr, seed) tuples.
+    - file_path (str): CSV file to write the collected rows to.
+    """
+    # Collect every worker's rows first and flush the file in one write, so
+    # the CSV is not dribbled out a few lines at a time between solves
+    lines = ["NPlayers,MaxNActions,Solver,Runtime,MaxViolation,NViolations,Welfare\n"]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for rows in executor.map(_run_job, jobs):
+            lines.extend(rows)
+    with open(file_path, "w") as f:
+        f.write("".join(lines))
+
+def lp_benchmark():
+    nplayers_arr = [2, 4, 7, 10]
+    nactions_arr = [2, 10, 25, 50]
+
+    jobs = []
+    for nplayers in nplayers_arr:
+        for i in range(10):
+            jobs.append((nplayers, 2, False, len(jobs)))
+    for nactions in nactions_arr:
+        for i in range(10):
+            jobs.append((2, nactions, False, len(jobs)))
+
+    file_path = "logs/lp_benchmarking.csv"
+    run_benchmark(jobs, file_path)
+    print(f"Benchmarking complete. Results logged to {file_path}.")
+
+def sr_benchmark():
+    nplayers_arr = [2, 3, 4, 5]
+    nactions_arr = [2, 3, 4, 5]
+
+    jobs = []
+    for nplayers in nplayers_arr:
+        for i in range(5):
+            jobs.append((nplayers, 2, True, len(jobs)))
+    for nactions in nactions_arr:
+        for i in range(5):
+            jobs.append((2, nactions, True, len(jobs)))
+
+    file_path = "logs/sr_benchmarking.csv"
+    run_benchmark(jobs, file_path)
+    print(f"Benchmarking complete. Results logged to {file_path}.")
+
+if __name__ == "__main__":
+    sr_benchmark()
@@ -1,160 +1,283 @@
-import numpy as np
-import itertools
-
-class Game:
-    """
-    Enum for the game type.
-    """
-    RANDOM = 0
-    CHICKEN = 1
-    CONGESTION = 2
-    CUSTOM = 3
-    def __init__(self, num_players, num_actions, game_type = RANDOM, payoff_matrices = None):
-        """
-        Initialize a normal form game.
-
-        Parameters:
-        - num_players (int): Number of players in the game.
-        - num_actions (list[int]): List of actions for each player, where num_actions[i] is the number of actions for player i.
-        - game_type (int): Type of game to generate (RANDOM, CHICKEN, CONGESTION, CUSTOM).
-        - payoff_matrices (list[np.ndarray]): A list of payoff matrices, one for each player. Required if game_type is CUSTOM.
-        """
-        self.num_players = num_players
-        self.num_actions = num_actions
-
-        if game_type == Game.RANDOM:
-            self.game_type = Game.RANDOM
-            self.payoff_matrices = self._generate_random_payoff_matrices()
-        elif game_type == Game.CHICKEN:
-            self.game_type = Game.CHICKEN
-            self.payoff_matrices = self._generate_chicken_payoff_matrices()
-        elif game_type == Game.CONGESTION:
-            self.game_type = Game.CONGESTION
-            self.payoff_matrices = self._generate_congestion_payoff_matrices()
-        elif game_type == Game.CUSTOM and payoff_matrices is not None:
-            self.game_type = Game.CUSTOM
-            self.payoff_matrices = self._generate_custom_payoff_matrices(payoff_matrices)
-        else:
-            raise ValueError("Invalid game type or missing payoff matrices.")
-
-    def _generate_random_payoff_matrices(self):
-        """
-        Generate random payoff matrices for each player.
-
-        Returns:
-        - list[np.ndarray]: A list of payoff matrices, one for each player.
-        """
-        payoff_matrices = []
-        joint_action_space = tuple(self.num_actions)
-        
-        for _ in range(self.num_players):
-            # Each player's payoff matrix has the same shape as the joint action space
-            payoff_matrix = np.random.uniform(-10, 10, size=joint_action_space)
-            payoff_matrices.append(payoff_matrix)
-        
-        return payoff_matrices
-
-    def _generate_chicken_payoff_matrices(self):
-        """
-        Generate payoff matrices for the Chicken game.
-
-        Returns:
-        - list[np.ndarray]: A list of payoff matrices, one for each player.
-        """
-        payoff_matrices = []
-
-        if (self.num_players != 2):
-            raise ValueError("Chicken game can only be played by two players.")
-        if (self.num_actions[0] != self.num_actions[1]):
-            raise ValueError("Both players must have the same number of actions.")
-        if (self.num_actions[0] < 2 or self.num_actions[1] < 2):
-            raise ValueError("Both players must have at least two actions.")
-        
-        player_1_payoffs = np.array([[0, -1], [1, -10]])
-        player_2_payoffs = np.array([[0, 1], [-1, -10]])
-
-        payoff_matrices.append(player_1_payoffs)
-        payoff_matrices.append(player_2_payoffs)
-        return payoff_matrices
-    
-    def _generate_congestion_payoff_matrices(self):
-        """
-        Generate payoff matrices for the Congestion game.
-
-        Returns:
-        - list[np.ndarray]: A list of payoff matrices, one for each player.
-        """
-        payoff_matrices = []
-        joint_action_space = tuple(self.num_actions)
-
-        for _ in range(self.num_players):
-            payoff_matrix = np.zeros(joint_action_space)
-            for action_profile in itertools.product(*[range(n) for n in self.num_actions]):
-                total_actions = sum(action_profile)
-                payoff_matrix[action_profile] = -total_actions
-            payoff_matrices.append(payoff_matrix)
-
-        print(payoff_matrices)
-
-        return payoff_matrices
-
-    def _generate_custom_payoff_matrices(self, payoff_matrices):
-        """
-        Generate custom payoff matrices for each player.
-
-        Parameters:
-        - payoff_matrices (list[np.ndarray]): A list of payoff matrices, one for each player.
-
-        Returns:
-        - list[np.ndarray]: A list of payoff matrices, one for each player.
-        """
-        for i, matrix in enumerate(payoff_matrices):
-            if matrix.shape != tuple(self.num_actions):
-                raise ValueError(f"Payoff matrix for player {i} has incorrect shape.")
-        return payoff_matrices
-
-    def get_payoff(self, actions):
-        """
-        Get the payoffs for all players given a specific joint action.
-
-        Parameters:
-        - actions (tuple[int]): A tuple specifying the action of each player.
-
-        Returns:
-        - list[float]: A list of payoffs, one for each player.
-        """
-        return [self.payoff_matrices[player][actions] for player in range(self.num_players)]
-    
-    def get_payoff_matrix(self, player):
-        """
-        Get the payoff matrix for a given player
-        """
-        return self.payoff_matrices[player]
-
-    def get_action_profiles(self):
-        """
-        Get all possible joint action profiles.
-
-        Returns:
-        - list[tuple[int]]: A list of all possible joint action profiles.
-        """
-        return list(itertools.product(*[range(n) for n in self.num_actions]))
-    
-    def get_max_payoff_difference(self):
-        """
-        Get the maximum difference between payoffs in the game.
-
-        Returns:
-        - float: The maximum difference between payoffs in the game.
-        """
-        max_diff = 0
-        for player in range(self.num_players):
-            max_diff = max(max_diff, np.max(self.payoff_matrices[player]) - np.min(self.payoff_matrices[player]))
-        return max_diff
-
-    def __repr__(self):
-        """String representation of the game."""
-        repr_str = f"Game with {self.num_players} players\n"
-        for i, matrix in enumerate(self.payoff_matrices):
-            repr_str += f"Player {i+1}'s Payoff Matrix:\n{matrix}\n\n"
+import numpy as np
+import itertools
+
+class Game:
+    """
+    Enum for the game type.
+    """
+    RANDOM = 0
+    CHICKEN = 1
+    CONGESTION = 2
+    CUSTOM = 3
+    def __init__(self, num_players, num_actions, game_type = RANDOM, payoff_matrices = None, rng = None):
+        """
+        Initialize a normal form game.
+
+        Parameters:
+        - num_players (int): Number of players in the game.
+        - num_actions (list[int]): List of actions for each player, where num_actions[i] is the number of actions for player i.
+        - game_type (int): Type of game to generate (RANDOM, CHICKEN, CONGESTION, CUSTOM).
+        - payoff_matrices (list[np.ndarray]): A list of payoff matrices, one for each player. Required if game_type is CUSTOM.
+        - rng (np.random.Generator): Optional generator used for random payoffs; pass a seeded generator for reproducible games.
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.num_players = num_players
+        self.num_actions = num_actions
+
+        # Lazily-built caches over the joint action space; solvers index the
+        # same profile structures repeatedly, so build them at most once.
+        self._action_profiles = None
+        self._profiles_arr = None
+        self._rows_by_pa = None
+        self._flat_profiles = None
+        self._swap_flat = {}
+        self._rolled_payoff = {}
+        self._total_payoff = None
+
+        if game_type == Game.RANDOM:
+            self.game_type = Game.RANDOM
+            self.payoff_matrices = self._generate_random_payoff_matrices()
+        elif game_type == Game.CHICKEN:
+            self.game_type = Game.CHICKEN
+            self.payoff_matrices = self._generate_chicken_payoff_matrices()
+        elif game_type == Game.CONGESTION:
+            self.game_type = Game.CONGESTION
+            self.payoff_matrices = self._generate_congestion_payoff_matrices()
+        elif game_type == Game.CUSTOM and payoff_matrices is not None:
+            self.game_type = Game.CUSTOM
+            self.payoff_matrices = self._generate_custom_payoff_matrices(payoff_matrices)
+        else:
+            raise ValueError("Invalid game type or missing payoff matrices.")
+
+        # Stack the per-player payoff tensors into one contiguous array of
+        # shape (num_players, *num_actions); all-player payoff lookups then
+        # reduce to a single indexing operation on the stack.
+        self.payoff_stack = np.stack(self.payoff_matrices)
+
+    def _generate_random_payoff_matrices(self):
+        """
+        Generate random payoff matrices for each player.
+
+        Returns:
+        - list[np.ndarray]: A list of payoff matrices, one for each player.
+        """
+        payoff_matrices = []
+        joint_action_space = tuple(self.num_actions)
+        
+        for _ in range(self.num_players):
+            # Each player's payoff matrix has the same shape as the joint action space
+            payoff_matrix = self.rng.uniform(-10, 10, size=joint_action_space)
+            payoff_matrices.append(payoff_matrix)
+        
+        return payoff_matrices
+
+    def _generate_chicken_payoff_matrices(self):
+        """
+        Generate payoff matrices for the Chicken game.
+
+        Returns:
+        - list[np.ndarray]: A list of payoff matrices, one for each player.
+        """
+        payoff_matrices = []
+
+        if (self.num_players != 2):
+            raise ValueError("Chicken game can only be played by two players.")
+        if (self.num_actions[0] != self.num_actions[1]):
+            raise ValueError("Both players must have the same number of actions.")
+        if (self.num_actions[0] < 2 or self.num_actions[1] < 2):
+            raise ValueError("Both players must have at least two actions.")
+        
+        player_1_payoffs = np.array([[0, -1], [1, -10]])
+        player_2_payoffs = np.array([[0, 1], [-1, -10]])
+
+        payoff_matrices.append(player_1_payoffs)
+        payoff_matrices.append(player_2_payoffs)
+        return payoff_matrices
+    
+    def _generate_congestion_payoff_matrices(self):
+        """
+        Generate payoff matrices for the Congestion game.
+
+        Returns:
+        - list[np.ndarray]: A list of payoff matrices, one for each player.
+        """
+        # The payoff at a joint action is minus the sum of the action indices,
+        # which broadcasts directly from the open-mesh action grids.
+        grids = np.ix_(*[np.arange(n) for n in self.num_actions])
+        base = -sum(grids).astype(float)
+
+        return [base.copy() for _ in range(self.num_players)]
+
+    def _generate_custom_payoff_matrices(self, payoff_matrices):
+        """
+        Generate custom payoff matrices for each player.
+
+        Parameters:
+        - payoff_matrices (list[np.ndarray]): A list of payoff matrices, one for each player.
+
+        Returns:
+        - list[np.ndarray]: A list of payoff matrices, one for each player.
+        """
+        for i, matrix in enumerate(payoff_matrices):
+            if matrix.shape != tuple(self.num_actions):
+                raise ValueError(f"Payoff matrix for player {i} has incorrect shape.")
+        return payoff_matrices
+
+    def get_payoff(self, actions):
+        """
+        Get the payoffs for all players given a specific joint action.
+
+        Parameters:
+        - actions (tuple[int]): A tuple specifying the action of each player.
+
+        Returns:
+        - list[float]: A list of payoffs, one for each player.
+        """
+        return list(self.get_payoffs_vec(actions))
+
+    def get_payoffs_vec(self, actions):
+        """
+        Get the payoffs for all players given a specific joint action, as one
+        contiguous vector gathered from the payoff stack in a single indexing
+        operation.
+
+        Parameters:
+        - actions (tuple[int]): A tuple specifying the action of each player.
+
+        Returns:
+        - np.ndarray: A vector of payoffs, one entry per player.
+        """
+        return self.payoff_stack[(slice(None),) + tuple(actions)]
+
+
+    def get_payoff_matrix(self, player):
+        """
+        Get the payoff matrix for a given player
+        """
+        return self.payoff_matrices[player]
+
+    def get_action_profiles(self):
+        """
+        Get all possible joint action profiles, built once and cached; the
+        LP solver asks for this list several times per solve.
+
+        Returns:
+        - list[tuple[int]]: A list of all possible joint action profiles.
+        """
+        if self._action_profiles is None:
+            self._action_profiles = list(
+                itertools.product(*[range(n) for n in self.num_actions])
+            )
+        return self._action_profiles
+
+    def get_profiles_array(self):
+        """
+        Get all joint action profiles as one (num_profiles, num_players) int
+        array, built once and cached.
+
+        Returns:
+        - np.ndarray: The stacked action profiles, in the same order as
+          get_action_profiles().
+        """
+        if self._profiles_arr is None:
+            self._profiles_arr = np.array(self.get_action_profiles())
+        return self._profiles_arr
+
+    def get_profile_rows(self, player, action):
+        """
+        Get the indices of all profiles where `player` plays `action`.
+
+        Returns:
+        - np.ndarray: Row indices into the profiles array, cached per
+          (player, action) pair.
+        """
+        if self._rows_by_pa is None:
+            profiles = self.get_profiles_array()
+            self._rows_by_pa = {
+                (i, a): np.nonzero(profiles[:, i] == a)[0]
+                for i in range(self.num_players)
+                for a in range(self.num_actions[i])
+            }
+        return self._rows_by_pa[(player, action)]
+
+    def get_flat_profiles(self):
+        """
+        Get the raveled (flat) index of every joint action profile, in the
+        same order as get_action_profiles(). Cached.
+
+        Returns:
+        - np.ndarray: Flat indices into a raveled payoff tensor.
+        """
+        if self._flat_profiles is None:
+            self._flat_profiles = np.ravel_multi_index(
+                self.get_profiles_array().T, tuple(self.num_actions)
+            )
+        return self._flat_profiles
+
+    def get_swap_flat_indices(self, player, action, alt_action):
+        """
+        Get the flat indices of the profiles obtained by replacing `action`
+        with `alt_action` in `player`'s slot, aligned row-for-row with
+        get_profile_rows(player, action). Cached per triple.
+
+        Returns:
+        - np.ndarray: Flat indices into a raveled payoff tensor.
+        """
+        key = (player, action, alt_action)
+        if key not in self._swap_flat:
+            rows = self.get_profile_rows(player, action)
+            # The deviated profile differs only in this player's slot, so its
+            # flat index just shifts by (alt - action) times that axis stride.
+            stride = int(np.prod(self.num_actions[player + 1:]))
+            self._swap_flat[key] = (
+                self.get_flat_profiles()[rows] + (alt_action - action) * stride
+            )
+        return self._swap_flat[key]
+
+    def get_rolled_payoff(self, player):
+        """
+        Get `player`'s payoff tensor with its own axis rolled to the front
+        and flattened to (num_actions[player], num_opponent_profiles), made
+        contiguous and cached. Row a holds the player's payoff for action a
+        against every opponent profile, which is the layout the vectorized
+        incentive checks consume.
+
+        Returns:
+        - np.ndarray: The rolled, flattened payoff matrix.
+        """
+        if player not in self._rolled_payoff:
+            self._rolled_payoff[player] = np.ascontiguousarray(
+                np.moveaxis(self.payoff_matrices[player], player, 0)
+            ).reshape(self.num_actions[player], -1)
+        return self._rolled_payoff[player]
+
+    def get_total_payoff(self):
+        """
+        Get the sum of all players' payoff tensors, cached. The social
+        welfare of a joint action is a single lookup in this tensor.
+
+        Returns:
+        - np.ndarray: Tensor of summed payoffs over players.
+        """
+        if self._total_payoff is None:
+            self._total_payoff = self.payoff_stack.sum(axis=0)
+        return self._total_payoff
+
+    def get_max_payoff_difference(self):
+        """
+        Get the maximum difference between payoffs in the game.
+
+        Returns:
+        - float: The maximum difference between payoffs in the game.
+        """
+        max_diff = 0
+        for player in range(self.num_players):
+            max_diff = max(max_diff, np.max(self.payoff_matrices[player]) - np.min(self.payoff_matrices[player]))
+        return max_diff
+
+    def __repr__(self):
+        """String representation of the game."""
+        repr_str = f"Game with {self.num_players} players\n"
+        for i, matrix in enumerate(self.payoff_matrices):
+            repr_str += f"Player {i+1}'s Payoff Matrix:\n{matrix}\n\n"
         return repr_str
\ No newline at end of file
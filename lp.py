@@ -1,90 +1,236 @@
-import numpy as np
-import pulp
-from pulp import PULP_CBC_CMD
-class LinearProgrammingSolver:
-    def __init__(self, game, maximize_welfare=False):
-        """
-        Initialize the solver with a NormalFormGame instance.
-
-        Parameters:
-        - game (NormalFormGame): An instance of the NormalFormGame class.
-        """
-        self.game = game
-        self.maximize_welfare = maximize_welfare
-
-    def get_name(self):
-        if self.maximize_welfare:
-            return "Linear Programming-Maximize Welfare"
-        else:
-            return "Linear Programming"
-        
-
-    def solve(self):
-        """
-        Find a correlated equilibrium using linear programming.
-
-        Parameters:
-        - maximize_welfare (bool): If True, maximizes social welfare.
-
-        Returns:
-        - dict: A dictionary of joint action probabilities.
-        """
-        prob = pulp.LpProblem("Correlated_Equilibrium", pulp.LpMaximize)
-
-        action_profiles = self.game.get_action_profiles()
-        
-        p = pulp.LpVariable.dicts("p", action_profiles, lowBound=0, upBound=1)
-
-        prob += pulp.lpSum([p[a] for a in action_profiles]) == 1, "Normalization"
-
-        for i in range(self.game.num_players):
-            for a_i in range(self.game.num_actions[i]):
-                for b_i in range(self.game.num_actions[i]):
-                    if a_i == b_i:
-                        continue
-                    prob += (
-                        pulp.lpSum(
-                            p[a] * self.game.payoff_matrices[i][a] for a in action_profiles if a[i] == a_i
-                        )
-                        >= pulp.lpSum(
-                            p[a] * self.game.payoff_matrices[i][a[:i] + (b_i,) + a[i + 1:]] 
-                            for a in action_profiles if a[i] == a_i
-                        ),
-                        f"Player_{i}_Action_{a_i}_to_{b_i}"
-                    )
-
-        if self.maximize_welfare:
-            prob += pulp.lpSum(
-                p[a] * sum(self.game.payoff_matrices[i][a] for i in range(self.game.num_players)) for a in action_profiles
-            ), "Maximize_Welfare"
-        else:
-            prob += 0, "Dummy_Objective"
-
-        status = prob.solve(PULP_CBC_CMD(msg=False))
-
-        # for i in range(self.game.num_players):
-        #     for a_i in range(self.game.num_actions[i]):
-        #         for b_i in range(self.game.num_actions[i]):
-        #             if a_i != b_i:
-        #                 lhs = sum(pulp.value(p[a]) * self.game.payoff_matrices[i][a] for a in action_profiles if a[i] == a_i)
-        #                 rhs = sum(pulp.value(p[a]) * self.game.payoff_matrices[i][a[:i] + (b_i,) + a[i + 1:]] for a in action_profiles if a[i] == a_i)
-        #                 print(f"Player {i}, Action {a_i} -> {b_i}: LHS={lhs:.4f}, RHS={rhs:.4f}")
-
-        if pulp.LpStatus[status] == "Optimal":
-            # Return the solution as a dictionary
-            return {a: pulp.value(p[a]) for a in action_profiles}
-        else:
-            return None
-
-    def print_correlated_equilibrium(self, correlated_eq):
-        """
-        Print the correlated equilibrium in a readable format.
-
-        Parameters:
-        - correlated_eq (dict): A dictionary of joint action probabilities.
-        """
-        print("Game:")
-        print(self.game) 
-        print("Correlated Equilibrium:")
-        for joint_action, prob in correlated_eq.items():
-            print(f"Joint Action {joint_action}: {prob:.2f}")
+import numpy as np
+import pulp
+from pulp import PULP_CBC_CMD
+
+try:
+    from scipy import sparse
+    from scipy.optimize import linprog
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+def _pulp_solver_cmd():
+    """
+    Pick the LP backend for the PuLP path: HiGHS when a binary is available
+    (it handles the large-action CE instances far better than CBC simplex),
+    otherwise the CBC build bundled with PuLP.
+    """
+    try:
+        highs = pulp.HiGHS_CMD(msg=False)
+        if highs.available():
+            return highs
+    except pulp.PulpError:
+        pass
+    return PULP_CBC_CMD(msg=False)
+
+
+class _LPStructure:
+    """
+    Shape-dependent (game-independent) structure of the CE constraint matrix:
+    the sparsity pattern plus gather indices into the raveled payoff stack.
+    Benchmark sweeps solve many random games of the same shape, so this is
+    built once per shape and the per-game work reduces to one coefficient
+    gather.
+    """
+
+    _cache = {}
+
+    def __init__(self, num_actions):
+        num_players = len(num_actions)
+        shape = tuple(num_actions)
+        profiles = np.array(list(np.ndindex(shape)))
+        flat_profiles = np.arange(profiles.shape[0])
+
+        row_idx, col_idx, player_idx, kept_idx, swap_idx = [], [], [], [], []
+        row = 0
+        for i in range(num_players):
+            stride = int(np.prod(shape[i + 1:]))
+            for a_i in range(num_actions[i]):
+                rows = np.nonzero(profiles[:, i] == a_i)[0]
+                for b_i in range(num_actions[i]):
+                    if a_i == b_i:
+                        continue
+                    row_idx.append(np.full(len(rows), row))
+                    col_idx.append(rows)
+                    player_idx.append(np.full(len(rows), i))
+                    kept_idx.append(flat_profiles[rows])
+                    swap_idx.append(flat_profiles[rows] + (b_i - a_i) * stride)
+                    row += 1
+
+        # Games where every player has a single action produce no incentive
+        # constraints at all, leaving the block lists empty; fall back to
+        # empty index arrays so the normalization-only LP still goes through.
+        empty = np.empty(0, dtype=np.int64)
+        self.num_rows = row
+        self.num_vars = profiles.shape[0]
+        self.row_idx = np.concatenate(row_idx) if row_idx else empty
+        self.col_idx = np.concatenate(col_idx) if col_idx else empty
+        self.player_idx = np.concatenate(player_idx) if player_idx else empty
+        self.kept_idx = np.concatenate(kept_idx) if kept_idx else empty
+        self.swap_idx = np.concatenate(swap_idx) if swap_idx else empty
+
+    @classmethod
+    def for_shape(cls, num_actions):
+        key = tuple(num_actions)
+        if key not in cls._cache:
+            cls._cache[key] = cls(num_actions)
+        return cls._cache[key]
+
+
+class LinearProgrammingSolver:
+    def __init__(self, game, maximize_welfare=False):
+        """
+        Initialize the solver with a NormalFormGame instance.
+
+        Parameters:
+        - game (NormalFormGame): An instance of the NormalFormGame class.
+        """
+        self.game = game
+        self.maximize_welfare = maximize_welfare
+
+    def get_name(self):
+        if self.maximize_welfare:
+            return "Linear Programming-Maximize Welfare"
+        else:
+            return "Linear Programming"
+        
+
+    def solve(self):
+        """
+        Find a correlated equilibrium using linear programming.
+
+        Returns:
+        - np.ndarray: A joint probability tensor shaped like the action
+          space.
+        """
+        if SCIPY_AVAILABLE:
+            return self._solve_scipy()
+        return self._solve_pulp()
+
+    def _solve_scipy(self):
+        """
+        Build the CE constraints as one sparse matrix and hand the whole LP to
+        HiGHS through scipy.optimize.linprog, skipping PuLP's per-variable
+        Python model construction and the CBC problem-file round trip.
+        """
+        action_profiles = self.game.get_action_profiles()
+        num_vars = len(action_profiles)
+
+        # Incentive constraints in <= 0 form: for each (player, a_i, b_i),
+        # sum over profiles with a_i of p[a] * (pay_swapped - pay_kept) <= 0.
+        # The sparsity pattern and gather indices are cached per shape, so a
+        # new game of a seen shape only pays for one coefficient gather.
+        structure = _LPStructure.for_shape(self.game.num_actions)
+        stack_flat = self.game.payoff_stack.reshape(self.game.num_players, -1)
+        data = (stack_flat[structure.player_idx, structure.swap_idx]
+                - stack_flat[structure.player_idx, structure.kept_idx])
+
+        A_ub = sparse.csr_matrix(
+            (data, (structure.row_idx, structure.col_idx)),
+            shape=(structure.num_rows, num_vars),
+        )
+        b_ub = np.zeros(structure.num_rows)
+
+        # Equilibrate the constraint rows to unit max-absolute-value; payoff
+        # differences straddle zero with widely varying magnitudes, and
+        # unscaled rows cost the solver extra iterations and pivot trouble.
+        row_max = np.abs(A_ub).max(axis=1).toarray().ravel()
+        row_scale = 1.0 / np.maximum(row_max, 1e-12)
+        A_ub = sparse.diags(row_scale) @ A_ub
+        b_ub *= row_scale
+
+        # Normalization constraint: probabilities sum to one
+        A_eq = sparse.csr_matrix(np.ones((1, num_vars)))
+        b_eq = np.ones(1)
+
+        if self.maximize_welfare:
+            welfare = self.game.get_total_payoff().ravel()
+            c = -welfare
+            # Scale the objective the same way; a positive scalar does not
+            # change the argmax.
+            c_max = np.abs(c).max()
+            if c_max > 0:
+                c = c / c_max
+        else:
+            c = np.zeros(num_vars)
+
+        result = linprog(c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                         bounds=(0, 1), method="highs")
+
+        if not result.success:
+            return None
+        return result.x.reshape(tuple(self.game.num_actions))
+
+    def _solve_pulp(self):
+        """
+        PuLP/CBC fallback used when SciPy is not installed.
+        """
+        prob = pulp.LpProblem("Correlated_Equilibrium", pulp.LpMaximize)
+
+        action_profiles = self.game.get_action_profiles()
+
+        p = pulp.LpVariable.dicts("p", action_profiles, lowBound=0, upBound=1)
+
+        prob += pulp.lpSum([p[a] for a in action_profiles]) == 1, "Normalization"
+
+        # Build incentive constraints from a profile index array instead of
+        # re-slicing tuples per profile: for each (player, a_i, b_i) gather the
+        # payoffs of the kept and deviated profiles in one NumPy pass and hand
+        # the (variable, coefficient) pairs straight to LpAffineExpression.
+        flat_profiles = self.game.get_flat_profiles()
+        variables = [p[a] for a in action_profiles]
+
+        for i in range(self.game.num_players):
+            payoffs_flat = self.game.payoff_matrices[i].ravel()
+            for a_i in range(self.game.num_actions[i]):
+                rows = self.game.get_profile_rows(i, a_i)
+                pay_kept = payoffs_flat[flat_profiles[rows]]
+                for b_i in range(self.game.num_actions[i]):
+                    if a_i == b_i:
+                        continue
+                    swap_idx = self.game.get_swap_flat_indices(i, a_i, b_i)
+                    pay_swapped = payoffs_flat[swap_idx]
+                    coeffs = pay_kept - pay_swapped
+                    expr = pulp.LpAffineExpression(
+                        [(variables[r], c) for r, c in zip(rows.tolist(), coeffs.tolist())]
+                    )
+                    prob += expr >= 0, f"Player_{i}_Action_{a_i}_to_{b_i}"
+
+        if self.maximize_welfare:
+            # Welfare coefficients come straight from the cached total-payoff
+            # tensor instead of a per-profile Python double loop
+            welfare = self.game.get_total_payoff().ravel()
+            prob += pulp.LpAffineExpression(
+                list(zip(variables, welfare[flat_profiles].tolist()))
+            ), "Maximize_Welfare"
+        else:
+            prob += 0, "Dummy_Objective"
+
+        status = prob.solve(_pulp_solver_cmd())
+
+        if pulp.LpStatus[status] == "Optimal":
+            # Return the solution as a joint probability tensor
+            values = np.fromiter(
+                (pulp.value(p[a]) for a in action_profiles),
+                dtype=float, count=len(action_profiles),
+            )
+            return values.reshape(tuple(self.game.num_actions))
+        else:
+            return None
+
+    def print_correlated_equilibrium(self, correlated_eq):
+        """
+        Print the correlated equilibrium in a readable format.
+
+        Parameters:
+        - correlated_eq (dict | np.ndarray): Joint action probabilities, as
+          a dictionary or a dense tensor.
+        """
+        print("Game:")
+        print(self.game)
+        print("Correlated Equilibrium:")
+        items = (correlated_eq.items() if isinstance(correlated_eq, dict)
+                 else np.ndenumerate(correlated_eq))
+        for joint_action, prob in items:
+            print(f"Joint Action {joint_action}: {prob:.2f}")
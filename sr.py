@@ -1,178 +1,649 @@
-import numpy as np
-from game import Game
-import math
-
-class SwapRegretPlayer:
-    def __init__(self, payoff_matrix, num_actions, player_index, eta=0.1):
-        """
-        Initialize the SwapRegretPlayer.
-
-        Parameters:
-        - payoff_matrix (np.ndarray): The payoff matrix indexed by tuples representing actions of all players.
-        - num_actions (int): The number of actions available to the player.
-        - player_index (int): The ID/index of the player with respect to the payoff matrix
-        - eta (float): Learning rate for the Multiplicative Weights algorithm.
-        """
-        self.num_actions = num_actions
-        self.eta = eta
-        self.player_index = player_index
-        
-        # Turn the payoff matrix into a loss matrix with a linear transformation to apply the MW setting
-        max_value = np.max(payoff_matrix) 
-        min_value = np.min(payoff_matrix)
-
-        if max_value == min_value:
-            normalized_matrix = np.zeros_like(payoff_matrix)
-        else:
-            normalized_matrix = (payoff_matrix - min_value) / (max_value - min_value)
-        self.loss_matrix = 1 - normalized_matrix
-
-        # Initialize weights for k copies of the Multiplicative Weights algorithm
-        # Each row corresponds to the weights of a particular action being replaced with another action.
-        self.weights = np.ones((num_actions, num_actions))
-        
-        # Initialize our meta-distribution actions
-        self.p = np.ones((num_actions)) / num_actions
-
-    def sample_action(self):
-        """
-        Sample an action based on the stationary distribution of the weight matrix Q.
-
-        Returns:
-        - action (int): The sampled action index.
-        """
-        # Sample an action based on the stationary distribution
-        return np.random.choice(self.num_actions, p=self.p)
-
-    def update_distributions(self, action_profile):
-        """
-        Update the player's weights based on the observed action profile.
-
-        Parameters:
-        - action_profile (tuple): The actions chosen by all players in the game.
-        """
-        # Compute the loss vector l
-        losses = np.zeros(self.num_actions)
-        for i in range(self.num_actions):
-            # Replace this player's action in the action profile with action i
-            modified_profile = list(action_profile)
-            modified_profile[self.player_index] = i
-            modified_profile = tuple(modified_profile)
-            
-            # Compute the loss for playing action i in the current profile
-            losses[i] = self.loss_matrix[modified_profile]
-
-        # Update weights for each copy of MW
-        for j in range(self.num_actions):
-            # Loss vector l scaled by p(j)
-            scaled_losses = losses * self.p[j]
-
-            # Update the jth row of weights using the scaled losses
-            self.weights[j] -= (self.eta * scaled_losses)
-        
-        # Normalize the weights to ensure they form a probability distribution
-        # Also clamp small negative weights at 0
-        self.weights = np.maximum(self.weights, 0)
-        self.weights = self.weights / self.weights.sum(axis=1, keepdims=True)
-        
-        # Compute the stationary distibution of our MW matrix
-        self.p = self._stationary_distribution(self.weights)
-    
-    # Helper method to calculate the stationary distribution of our k MW copies
-    def _stationary_distribution(self, Q):
-        # Dimensions of the matrix
-        n = Q.shape[0]
-        
-        # Transpose the weights matrix
-        Q_T = Q.T
-
-        # Set up the augmented system to solve (Q^T - I)p = 0, with constraints on P
-        A = np.vstack([Q_T - np.eye(n), np.ones(n)])  # Augment with normalization constraint
-        b = np.zeros(n + 1)
-        b[-1] = 1  # Normalization constraint
-        
-        p = np.linalg.lstsq(A, b, rcond=None)[0]
-        
-        return np.clip(p, 0, None) 
-
-    def __repr__(self):
-        return (
-            f"SwapRegretPlayer(num_actions={self.num_actions}, eta={self.eta}, "
-            f"weights=\n{self.weights})"
-        )
-
-
-class SwapRegretSolver:
-    def __init__(self, game: Game, T=None, learning_rate=None, epsilon=0.1):
-        """
-        Initialize the Swap Regret Solver.
-
-        Parameters:
-        - game (NormalFormGame): The game instance.
-        - T (int): Number of iterations to run the regret minimization algorithm.
-        - learning_rate (float): Step size for adjusting probabilities.
-        """
-        self.game = game
-        self.T = T
-        self.epsilon = epsilon
-
-        # For a target epsilon-approx CE, adjust the solvers epsilon to be such that
-        # The algo will have epsilon regret after losses are converted back from [0,1] to payoffs
-        
-        max_transform_range = max([np.max(m) - np.min(m) for m in self.game.payoff_matrices])
-        self.adjusted_epsilon = epsilon / max_transform_range
-
-        self.num_players = game.num_players
-        self.num_actions = game.num_actions
-
-        if T:
-            self.T = T
-        else:
-            self.T = int((4 * (np.max(self.num_actions) ** 2) * math.log(np.max(self.num_actions))) / (self.adjusted_epsilon ** 2))
-        
-        if learning_rate:
-            self.learning_rate = learning_rate
-        else:
-            self.learning_rate = math.sqrt(math.log(np.max(self.num_actions))/self.T)
-    
-        self.players = [
-            SwapRegretPlayer(game.get_payoff_matrix(player), game.num_actions[player], player, eta=self.learning_rate)
-            for player in range(self.num_players)
-        ]
-
-    def get_name(self):
-        return "Swap Regret"
-
-    def solve(self):
-        """
-        Find an approximate correlated equilibrium using swap regret minimization.
-
-        Returns:
-        - dict: An approximate correlated equilibrium as a probability distribution.
-        """
-        empirical_distribution = {}
-        action_counts = {}
-        print(f"Running Swap Regret Solver for {self.T} iterations...")
-
-        for _ in range(self.T):
-            # Sample actions for each player
-            action_profile = tuple(player.sample_action() for player in self.players)
-
-            # Update action counts
-            if action_profile not in action_counts:
-                action_counts[action_profile] = 0
-            action_counts[action_profile] += 1
-
-            # Update each player with the joint action profile
-            for player in self.players:
-                player.update_distributions(action_profile)
-
-        # Normalize action counts to form the empirical distribution
-        for action_profile, count in action_counts.items():
-            empirical_distribution[action_profile] = count / self.T
-
-        for a in self.game.get_action_profiles():
-            if action_profile not in empirical_distribution:
-                empirical_distribution[a] = 0;
-
-        return empirical_distribution
+import numpy as np
+from game import Game
+import math
+from functools import reduce
+
+try:
+    from scipy.special import softmax
+except ImportError:
+    def softmax(x, axis=None):
+        z = x - np.max(x, axis=axis, keepdims=True)
+        z = np.exp(z)
+        return z / z.sum(axis=axis, keepdims=True)
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+
+def _solve_loop(loss_flat, strides, num_actions, log_weights, weights, ps, U, eta,
+                counts):
+    """
+    T-step loop of the swap regret dynamics, written to be compiled by numba
+    (see the serial and parallel variants below).
+
+    Loss tensors are passed flattened (one row per player) together with the
+    strides of the joint action space, so the kernel works for any number of
+    players without tuple indexing. `weights` and `ps` are padded to the
+    largest action count and updated in place. The per-player update touches
+    only player-local state and per-player scratch rows, so the parallel
+    variant can safely prange over it.
+    """
+    T, P = U.shape
+    kmax = 0
+    for p in range(P):
+        if num_actions[p] > kmax:
+            kmax = num_actions[p]
+    actions = np.zeros(P, dtype=np.int64)
+    # Scratch rows for the per-player loss gather and the power-iteration
+    # vector, one row per player so parallel updates never share a buffer
+    losses = np.empty((P, kmax), dtype=loss_flat.dtype)
+    vbuf = np.empty((P, kmax), dtype=ps.dtype)
+
+    for t in range(T):
+        # Sample an action for each player by inverting the CDF of p
+        flat = 0
+        for p in range(P):
+            k = num_actions[p]
+            u = U[t, p]
+            a = k - 1
+            c = 0.0
+            for i in range(k):
+                c += ps[p, i]
+                if u < c:
+                    a = i
+                    break
+            actions[p] = a
+            flat += a * strides[p]
+        counts[flat] += 1
+
+        for p in prange(P):
+            k = num_actions[p]
+            stride = strides[p]
+            base = flat - actions[p] * stride
+            lo = losses[p]
+            vb = vbuf[p]
+
+            # Loss of replacing this player's action with each alternative;
+            # an all-zero vector leaves the weights and p fixed, so the
+            # update is skipped outright
+            allzero = True
+            for i in range(k):
+                lo[i] = loss_flat[p, base + i * stride]
+                if lo[i] != 0.0:
+                    allzero = False
+            if allzero:
+                continue
+
+            # Rank-1 MW update in log space, then a stabilized softmax per row
+            w = weights[p]
+            lw = log_weights[p]
+            for j in range(k):
+                pj = ps[p, j]
+                for i in range(k):
+                    lw[j, i] -= eta * pj * lo[i]
+                m = lw[j, 0]
+                for i in range(1, k):
+                    if lw[j, i] > m:
+                        m = lw[j, i]
+                s = 0.0
+                for i in range(k):
+                    v = math.exp(lw[j, i] - m)
+                    w[j, i] = v
+                    s += v
+                for i in range(k):
+                    w[j, i] /= s
+
+            # Stationary distribution of the strictly positive row-stochastic
+            # weight matrix, by power iteration warm-started from the current
+            # p; one MW step barely moves the fixed point, so this converges
+            # in a few sweeps
+            for _ in range(50):
+                s = 0.0
+                for i in range(k):
+                    acc = 0.0
+                    for j in range(k):
+                        acc += ps[p, j] * w[j, i]
+                    vb[i] = acc
+                    s += acc
+                diff = 0.0
+                for i in range(k):
+                    vb[i] /= s
+                    d = vb[i] - ps[p, i]
+                    if d < 0.0:
+                        d = -d
+                    if d > diff:
+                        diff = d
+                    ps[p, i] = vb[i]
+                if diff < _STATIONARY_TOL:
+                    break
+
+
+if NUMBA_AVAILABLE:
+    # One kernel source, two compilations: the serial variant treats prange
+    # as range; the parallel one splits the per-player update across threads,
+    # which only pays off once there are enough players to amortize the fork
+    _solve_kernel = njit(cache=True)(_solve_loop)
+    _solve_kernel_parallel = njit(cache=True, parallel=True)(_solve_loop)
+else:
+    _solve_kernel = _solve_loop
+    _solve_kernel_parallel = _solve_loop
+
+# Minimum player count before the parallel kernel is worth its threading
+# overhead; below this the per-step update is a few microseconds of work
+_PARALLEL_MIN_PLAYERS = 8
+
+# Largest joint action space for which the deterministic expected-update
+# dynamics are enabled by default when no compiled sampling kernel is
+# available; beyond this the per-step joint product outweighs the variance
+# reduction. With numba present the compiled sampler is far faster per step
+# at the same T, so the expected path is opt-in there.
+_EXPECTED_MAX_PROFILES = 256
+
+# The SR state (losses, weights, distributions) is kept in single precision:
+# losses are normalized to [0, 1] and the target epsilons sit far above
+# float32 resolution, while halving the state size doubles the effective
+# bandwidth of the hot loop. The stationary-iteration tolerance sits a few
+# decades above float32 eps accordingly.
+_SR_DTYPE = np.float32
+_STATIONARY_TOL = 1e-6
+
+
+class SwapRegretPlayer:
+    def __init__(self, payoff_matrix, num_actions, player_index, eta=0.1,
+                 payoff_bounds=None):
+        """
+        Initialize the SwapRegretPlayer.
+
+        Parameters:
+        - payoff_matrix (np.ndarray): The payoff matrix indexed by tuples representing actions of all players.
+        - num_actions (int): The number of actions available to the player.
+        - player_index (int): The ID/index of the player with respect to the payoff matrix
+        - eta (float): Learning rate for the Multiplicative Weights algorithm.
+        - payoff_bounds (tuple[float, float]): Optional precomputed
+          (min, max) of the payoff matrix, so a caller that already scanned
+          the tensor can spare the player a second pass.
+        """
+        self.num_actions = num_actions
+        self.eta = eta
+        self.player_index = player_index
+
+        # Turn the payoff matrix into a loss matrix with a linear transformation to apply the MW setting
+        if payoff_bounds is not None:
+            min_value, max_value = payoff_bounds
+        else:
+            max_value = np.max(payoff_matrix)
+            min_value = np.min(payoff_matrix)
+
+        if max_value == min_value:
+            normalized_matrix = np.zeros_like(payoff_matrix)
+        else:
+            normalized_matrix = (payoff_matrix - min_value) / (max_value - min_value)
+        self.loss_matrix = (1 - normalized_matrix).astype(_SR_DTYPE)
+
+        # Copy of the loss tensor with this player's axis moved last, so the
+        # per-step loss vector (own axis free, opponents' actions fixed) is a
+        # contiguous, stride-1 row of memory instead of a strided gather
+        self.loss_rolled = np.ascontiguousarray(
+            np.moveaxis(self.loss_matrix, player_index, -1)
+        )
+
+        # Weights for k copies of the Multiplicative Weights algorithm, kept
+        # in log space so cumulative updates cannot overflow or collapse a
+        # row to zero. Each row corresponds to the weights of a particular
+        # action being replaced with another action; `weights` is the
+        # row-normalized (softmax) view used for the stationary distribution.
+        self.log_weights = np.zeros((num_actions, num_actions), dtype=_SR_DTYPE)
+        self.weights = softmax(self.log_weights, axis=1)
+        self._outer_buf = np.empty((num_actions, num_actions), dtype=_SR_DTYPE)
+        self._rowmax = np.empty((num_actions, 1), dtype=_SR_DTYPE)
+        self._stat_v = np.empty(num_actions, dtype=_SR_DTYPE)
+        self._stat_nxt = np.empty(num_actions, dtype=_SR_DTYPE)
+        
+        # Initialize our meta-distribution actions, the cached CDF used for
+        # sampling, and a dedicated Generator (much cheaper per draw than the
+        # legacy global np.random state)
+        self.p = np.ones((num_actions), dtype=_SR_DTYPE) / num_actions
+        self._cdf = np.cumsum(self.p)
+        self._rng = np.random.default_rng()
+
+    def sample_action(self, u=None):
+        """
+        Sample an action based on the stationary distribution of the weight matrix Q.
+
+        Parameters:
+        - u (float): Optional pre-drawn uniform sample in [0, 1); drawn from
+          the player's own Generator when omitted. Either way the action is
+          found by inverting the cached CDF of p with searchsorted, which
+          avoids the per-call validation overhead of np.random.choice.
+
+        Returns:
+        - action (int): The sampled action index.
+        """
+        if u is None:
+            u = self._rng.random()
+        return min(int(np.searchsorted(self._cdf, u, side="right")), self.num_actions - 1)
+
+    def _build_alias(self):
+        """
+        Build a Walker alias table for the current p: O(k) setup after which
+        each draw costs O(1) instead of the O(log k) CDF inversion.
+
+        Returns:
+        - (np.ndarray, np.ndarray): Acceptance probabilities and alias
+          targets, one entry per action.
+        """
+        k = self.num_actions
+        prob = np.empty(k)
+        alias = np.zeros(k, dtype=np.int64)
+        scaled = self.p.astype(np.float64) * k
+
+        small = [i for i in range(k) if scaled[i] < 1.0]
+        large = [i for i in range(k) if scaled[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (large if scaled[l] >= 1.0 else small).append(l)
+        # Leftovers are exactly 1 up to rounding
+        while large:
+            prob[large.pop()] = 1.0
+        while small:
+            prob[small.pop()] = 1.0
+        return prob, alias
+
+    def sample_actions(self, n):
+        """
+        Draw n i.i.d. actions from the current p with the alias method.
+
+        The solve loop cannot use this — p changes after every single draw
+        there, and rebuilding the table per draw costs more than one CDF
+        inversion — but batch consumers sampling many plays from a fixed
+        distribution get constant time per draw. Each uniform is split into
+        its bucket (integer part after scaling by k) and the accept/alias
+        coin (fractional part), so one random number serves both decisions.
+
+        Parameters:
+        - n (int): Number of actions to draw.
+
+        Returns:
+        - np.ndarray: The sampled action indices.
+        """
+        prob, alias = self._build_alias()
+        scaled = self._rng.random(n) * self.num_actions
+        idx = scaled.astype(np.int64)
+        frac = scaled - idx
+        return np.where(frac < prob[idx], idx, alias[idx])
+
+    def update_weights(self, losses):
+        """
+        Apply one MW step for the given loss vector.
+
+        Updates all k copies of MW at once: row j of the update is the loss
+        vector scaled by p(j), so the whole thing is one rank-1 outer product
+        on the log weights. The stabilized softmax (fused in place into the
+        preallocated weights buffer) renormalizes each row without the
+        overflow/zero-row hazards of exponentiating the weights directly.
+
+        Parameters:
+        - losses (np.ndarray): Loss of each replacement action this step.
+        """
+        # Form the rank-1 step in a preallocated buffer so the hot path
+        # allocates nothing: outer product, scale by eta, subtract
+        np.multiply(self.p[:, None], losses, out=self._outer_buf)
+        self._outer_buf *= self.eta
+        self.log_weights -= self._outer_buf
+        self.log_weights.max(axis=1, keepdims=True, out=self._rowmax)
+        np.subtract(self.log_weights, self._rowmax, out=self.weights)
+        np.exp(self.weights, out=self.weights)
+        self.weights.sum(axis=1, keepdims=True, out=self._rowmax)
+        self.weights /= self._rowmax
+
+    def refresh_stationary(self):
+        """
+        Recompute the stationary distribution of the current weight matrix,
+        writing p in place (so it may be a row view of solver-owned storage)
+        and refreshing the sampling CDF to match.
+        """
+        self.p[:] = self._stationary_distribution(self.weights)
+        np.cumsum(self.p, out=self._cdf)
+
+    def update_distributions(self, action_profile):
+        """
+        Update the player's weights based on the observed action profile.
+
+        Parameters:
+        - action_profile (tuple): The actions chosen by all players in the game.
+        """
+        # Index the rolled loss tensor by the opponents' actions; with this
+        # player's axis last, the resulting loss vector over all replacement
+        # actions is a contiguous row read
+        i = self.player_index
+        losses = self.loss_rolled[action_profile[:i] + action_profile[i + 1:]]
+
+        # An all-zero loss vector leaves the weights — and hence their
+        # stationary distribution — exactly fixed, so skip the whole update
+        if not losses.any():
+            return
+        self.update_weights(losses)
+        self.refresh_stationary()
+    
+    # Helper method to calculate the stationary distribution of our k MW copies
+    def _stationary_distribution(self, Q):
+        # Q has strictly positive entries (softmax rows), so the stationary
+        # distribution is unique and power iteration converges. Warm-start
+        # from the current p: the weights move by one small MW step per call,
+        # so the previous fixed point is already near the new one and the
+        # iteration typically needs only a few sweeps, versus a full lstsq
+        # factorization per step.
+        # The iterate and its successor live in preallocated buffers and are
+        # ping-ponged by reference, so the iteration allocates nothing
+        v = self._stat_v
+        nxt = self._stat_nxt
+        v[:] = self.p
+        for _ in range(50):
+            np.matmul(v, Q, out=nxt)
+            nxt /= nxt.sum()
+            if np.abs(nxt - v).max() < _STATIONARY_TOL:
+                return nxt
+            v, nxt = nxt, v
+        return v
+
+    def __repr__(self):
+        return (
+            f"SwapRegretPlayer(num_actions={self.num_actions}, eta={self.eta}, "
+            f"weights=\n{self.weights})"
+        )
+
+
+class SwapRegretSolver:
+    def __init__(self, game: Game, T=None, learning_rate=None, epsilon=0.1, seed=None,
+                 verbose=False, expected=None):
+        """
+        Initialize the Swap Regret Solver.
+
+        Parameters:
+        - game (NormalFormGame): The game instance.
+        - T (int): Number of iterations to run the regret minimization algorithm.
+        - learning_rate (float): Step size for adjusting probabilities.
+        - seed (int): Optional seed for the sampling RNG, for reproducible runs.
+        - verbose (bool): Whether to print progress when solving.
+        - expected (bool): Run the deterministic expected-update dynamics
+          instead of sampling action profiles. Defaults to None, which
+          enables it only for small joint action spaces when the compiled
+          sampling kernel is unavailable.
+        """
+        self.game = game
+        self.T = T
+        self.epsilon = epsilon
+        self.verbose = verbose
+        self.expected = expected
+        self.rng = np.random.default_rng(seed)
+
+        # For a target epsilon-approx CE, adjust the solvers epsilon to be such that
+        # The algo will have epsilon regret after losses are converted back from [0,1] to payoffs
+        
+        # One scan per payoff tensor serves both the epsilon adjustment here
+        # and the players' loss normalization below
+        payoff_bounds = [
+            (float(np.min(m)), float(np.max(m))) for m in self.game.payoff_matrices
+        ]
+        max_transform_range = max(mx - mn for mn, mx in payoff_bounds)
+        self.adjusted_epsilon = epsilon / max_transform_range
+
+        self.num_players = game.num_players
+        self.num_actions = game.num_actions
+
+        if T:
+            self.T = T
+        else:
+            self.T = int((4 * (np.max(self.num_actions) ** 2) * math.log(np.max(self.num_actions))) / (self.adjusted_epsilon ** 2))
+        
+        if learning_rate:
+            self.learning_rate = learning_rate
+        else:
+            self.learning_rate = math.sqrt(math.log(np.max(self.num_actions))/self.T)
+    
+        self.players = [
+            SwapRegretPlayer(game.get_payoff_matrix(player), game.num_actions[player], player, eta=self.learning_rate, payoff_bounds=payoff_bounds[player])
+            for player in range(self.num_players)
+        ]
+
+        # For homogeneous games (every player has the same action count — the
+        # benchmark case) the per-player state is kept stacked in solver-owned
+        # arrays, with each player's p and weight matrices rebound to views of
+        # its slice. Sampling, the MW step and the softmax then vectorize
+        # across the player axis; players that update in place keep the views
+        # live.
+        self._homogeneous = len(set(self.num_actions)) == 1
+        if self._homogeneous:
+            self._ps_mat = np.stack([player.p for player in self.players])
+            self._logw_mat = np.stack([player.log_weights for player in self.players])
+            self._w_mat = np.stack([player.weights for player in self.players])
+            self._loss_flat_mat = np.stack(
+                [player.loss_matrix.ravel() for player in self.players]
+            )
+            self._strides = np.asarray(
+                [int(np.prod(self.num_actions[p + 1:])) for p in range(self.num_players)],
+                dtype=np.int64,
+            )
+            for p, player in enumerate(self.players):
+                player.p = self._ps_mat[p]
+                player.log_weights = self._logw_mat[p]
+                player.weights = self._w_mat[p]
+
+    def get_name(self):
+        return "Swap Regret"
+
+    def solve(self):
+        """
+        Find an approximate correlated equilibrium using swap regret minimization.
+
+        Returns:
+        - np.ndarray: An approximate correlated equilibrium as a joint
+          probability tensor shaped like the action space.
+        """
+        if self.verbose:
+            print(f"Running Swap Regret Solver for {self.T} iterations...")
+
+        # The expected path runs a Python-level loop over the full T, so by
+        # default it only replaces the sampling loop when the latter cannot
+        # be compiled; with numba available it must be requested explicitly.
+        expected = self.expected
+        if expected is None:
+            expected = (not NUMBA_AVAILABLE
+                        and int(np.prod(self.num_actions)) <= _EXPECTED_MAX_PROFILES)
+
+        if expected:
+            counts = self._solve_expected()
+        else:
+            # Draw all the uniform samples needed for the run up front; the
+            # distributions change each iteration, so the CDF inversion
+            # itself still happens per step, but the Python-level RNG calls
+            # are batched.
+            U = self.rng.random((self.T, self.num_players))
+
+            if NUMBA_AVAILABLE:
+                counts = self._solve_compiled(U)
+            else:
+                counts = self._solve_python(U)
+
+        # Solvers return the distribution as a dense tensor shaped like the
+        # joint action space; tester.to_dict recovers the sparse dictionary
+        # form when one is wanted.
+        return counts / self.T
+
+    def _solve_expected(self):
+        """
+        Deterministic variant of the T-step loop: instead of sampling one
+        profile per step, each player updates on its exact expected loss
+        under the opponents' current product distribution, and that product
+        distribution is accumulated in place of sample counts. This removes
+        all sampling variance, at the cost of materializing the joint
+        product each step — hence it is only the default for small joint
+        action spaces.
+
+        Returns:
+        - np.ndarray: Accumulated joint probabilities, in the same units as
+          the sampled counts (solve() divides by T).
+        """
+        players = self.players
+        probs = np.zeros(tuple(self.num_actions))
+
+        for _ in range(self.T):
+            # Snapshot the start-of-step distributions so every player's
+            # expected loss is taken against the same opponent play
+            ps = [player.p.copy() for player in players]
+            probs += reduce(np.multiply.outer, ps)
+
+            for i, player in enumerate(players):
+                opp = ps[:i] + ps[i + 1:]
+                if opp:
+                    # Expected loss of each replacement action: opponents'
+                    # joint probabilities against the rolled loss tensor
+                    opp_joint = reduce(np.multiply.outer, opp)
+                    losses = opp_joint.ravel() @ player.loss_rolled.reshape(
+                        -1, player.num_actions
+                    )
+                else:
+                    losses = player.loss_rolled
+                player.update_weights(losses)
+                player.refresh_stationary()
+
+        return probs
+
+    def _solve_compiled(self, U):
+        """
+        Run the T-step loop through the Numba kernel on flattened, padded
+        copies of the per-player state, then write the state back.
+        """
+        P = self.num_players
+        kmax = max(self.num_actions)
+        num_actions = np.asarray(self.num_actions, dtype=np.int64)
+        strides = np.asarray(
+            [int(np.prod(self.num_actions[p + 1:])) for p in range(P)], dtype=np.int64
+        )
+        nprofiles = int(np.prod(self.num_actions))
+
+        loss_flat = np.empty((P, nprofiles), dtype=_SR_DTYPE)
+        log_weights = np.zeros((P, kmax, kmax), dtype=_SR_DTYPE)
+        weights = np.zeros((P, kmax, kmax), dtype=_SR_DTYPE)
+        ps = np.zeros((P, kmax), dtype=_SR_DTYPE)
+        for p, player in enumerate(self.players):
+            k = player.num_actions
+            loss_flat[p] = player.loss_matrix.ravel()
+            log_weights[p, :k, :k] = player.log_weights
+            weights[p, :k, :k] = player.weights
+            ps[p, :k] = player.p
+
+        counts = np.zeros(nprofiles, dtype=np.int64)
+        kernel = (_solve_kernel_parallel if P >= _PARALLEL_MIN_PLAYERS
+                  else _solve_kernel)
+        kernel(loss_flat, strides, num_actions, log_weights, weights, ps, U,
+               self.learning_rate, counts)
+
+        for p, player in enumerate(self.players):
+            k = player.num_actions
+            player.log_weights[:] = log_weights[p, :k, :k]
+            player.weights[:] = weights[p, :k, :k]
+            player.p[:] = ps[p, :k]
+            np.cumsum(player.p, out=player._cdf)
+
+        return counts.reshape(tuple(self.num_actions))
+
+    def _solve_python(self, U):
+        """
+        Pure-Python fallback for the T-step loop, used when Numba is not
+        installed.
+        """
+        # Bind loop invariants to locals: attribute loads inside a loop that
+        # runs T times are a measurable cost on the pure-Python path
+        T = self.T
+        players = self.players
+        kmax = max(self.num_actions)
+        cumsum = np.cumsum
+        sampled = np.empty((T, self.num_players), dtype=np.int64)
+
+        if self._homogeneous:
+            # Every per-step stage runs batched over the player axis on the
+            # solver-owned stacked state: CDF inversion for sampling, the
+            # rank-1 MW step, the row softmax and the warm-started power
+            # iteration (whose rows freeze individually as they converge, so
+            # each player sees exactly the sweeps it needs).
+            P = self.num_players
+            ps_mat = self._ps_mat
+            logw = self._logw_mat
+            w = self._w_mat
+            loss_flat = self._loss_flat_mat
+            strides = self._strides
+            eta = self.learning_rate
+            rows = np.arange(P)[:, None]
+            offs = np.arange(kmax)[None, :] * strides[:, None]
+            outer_buf = np.empty_like(logw)
+
+            for t in range(T):
+                cdfs = cumsum(ps_mat, axis=1)
+                actions = np.minimum((cdfs <= U[t][:, None]).sum(axis=1), kmax - 1)
+                sampled[t] = actions
+
+                # Each player's loss row for the sampled profile, gathered
+                # from the flattened loss stack by stride arithmetic
+                bases = (actions * strides).sum() - actions * strides
+                losses_mat = loss_flat[rows, bases[:, None] + offs]
+
+                np.multiply(ps_mat[:, :, None], losses_mat[:, None, :],
+                            out=outer_buf)
+                outer_buf *= eta
+                logw -= outer_buf
+                np.subtract(logw, logw.max(axis=2, keepdims=True), out=w)
+                np.exp(w, out=w)
+                w /= w.sum(axis=2, keepdims=True)
+
+                # Players whose loss row is all zero keep their weights and
+                # p exactly (the MW step above subtracted exact zeros), so
+                # only the others enter the power iteration
+                active = losses_mat.any(axis=1)
+                if active.any():
+                    for _ in range(50):
+                        nxt = np.matmul(ps_mat[:, None, :], w)[:, 0, :]
+                        nxt /= nxt.sum(axis=1, keepdims=True)
+                        diffs = np.abs(nxt - ps_mat).max(axis=1)
+                        ps_mat[active] = nxt[active]
+                        active &= diffs >= _STATIONARY_TOL
+                        if not active.any():
+                            break
+
+            for player in players:
+                np.cumsum(player.p, out=player._cdf)
+        else:
+            for t in range(T):
+                # Build the joint profile tuple once per step; it is reused
+                # for the sample log and every player's update
+                u_row = U[t]
+                action_profile = tuple(
+                    [player.sample_action(u=u_row[i])
+                     for i, player in enumerate(players)]
+                )
+                sampled[t] = action_profile
+
+                # Update each player with the joint action profile
+                for player in players:
+                    player.update_distributions(action_profile)
+
+        # Accumulate the empirical action counts in a single batched pass:
+        # ravel the sampled profiles to flat indices and histogram them with
+        # bincount, which is substantially faster than np.add.at's
+        # unbuffered fancy-index accumulation
+        shape = tuple(self.num_actions)
+        flat = np.ravel_multi_index(tuple(sampled.T), shape)
+        return np.bincount(flat, minlength=int(np.prod(shape))).reshape(shape)
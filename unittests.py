@@ -1,49 +1,78 @@
-import numpy as np
-from game import Game
-from lp import LinearProgrammingSolver
-from sr import SwapRegretSolver
-from tester import collect_violations, visualize_violations_heatmap
-
-def chicken_test():
-    num_players = 2
-    num_actions = [2, 2]
-    game = Game(num_players, num_actions, game_type=Game.CHICKEN)
-    print("Game type: Chicken")
-    print(game.payoff_matrices)
-    print("Solving with Linear Programming...")
-    solver = LinearProgrammingSolver(game)
-    distribution = solver.solve()
-    print(distribution)
-    violations = collect_violations(game, distribution)
-    print(violations)
-    print("Solving with Swap Regret...")
-    solver = SwapRegretSolver(game)
-    distribution = solver.solve()
-    print(distribution)
-    violations = collect_violations(game, distribution, epsilon=solver.epsilon)
-    print(violations)
-
-def congestion_test():
-    num_players = 2
-    num_actions = [2, 2]
-    game = Game(num_players, num_actions, game_type=Game.CUSTOM, payoff_matrices=[np.array([[-5, -2], [-3, -6]]), np.array([[-5, -3], [-2, -6]])])
-    print("Game type: Congestion")
-    print(game.payoff_matrices)
-    print("Solving with Linear Programming...")
-    solver = LinearProgrammingSolver(game, maximize_welfare=True)
-    distribution = solver.solve()
-    print(distribution)
-    violations = collect_violations(game, distribution)
-    print("Solving with Swap Regret...")
-    solver = SwapRegretSolver(game)
-    distribution = solver.solve()
-    print(distribution)
-    violations = collect_violations(game, distribution, epsilon=solver.epsilon)
-    print(violations)
-
-def main():
-    chicken_test()
-    congestion_test()
-
-if __name__ == "__main__":
-    chicken_test()
\ No newline at end of file
+import numpy as np
+from game import Game
+from lp import LinearProgrammingSolver
+from sr import SwapRegretSolver
+from tester import collect_violations, visualize_violations_heatmap
+
+# Solutions memoized across test runs, keyed on the game's payoff bytes and
+# the solver configuration; the expensive solves only run once per distinct
+# (game, solver) combination no matter how many tests share it.
+_SOLVE_CACHE = {}
+
+def solve_cached(game, solver_factory, key_extra):
+    """
+    Solve a game through solver_factory, memoizing on the game's type and
+    payoff contents plus a caller-supplied solver tag.
+
+    Parameters:
+    - game (Game): The game to solve.
+    - solver_factory (callable): Called with the game to build the solver.
+    - key_extra (hashable): Distinguishes solver configurations (name,
+      relevant options) that share the same game.
+
+    Returns:
+    - (np.ndarray, solver): The solved joint probability tensor and the
+      solver that made it.
+    """
+    key = (
+        game.game_type,
+        tuple(game.num_actions),
+        game.payoff_stack.tobytes(),
+        key_extra,
+    )
+    if key not in _SOLVE_CACHE:
+        solver = solver_factory(game)
+        _SOLVE_CACHE[key] = (solver.solve(), solver)
+    return _SOLVE_CACHE[key]
+
+def chicken_test():
+    num_players = 2
+    num_actions = [2, 2]
+    game = Game(num_players, num_actions, game_type=Game.CHICKEN)
+    print("Game type: Chicken")
+    print(game.payoff_matrices)
+    print("Solving with Linear Programming...")
+    distribution, solver = solve_cached(game, LinearProgrammingSolver, "lp")
+    print(distribution)
+    violations = collect_violations(game, distribution)
+    print(violations)
+    print("Solving with Swap Regret...")
+    distribution, solver = solve_cached(game, SwapRegretSolver, "sr")
+    print(distribution)
+    violations = collect_violations(game, distribution, epsilon=solver.epsilon)
+    print(violations)
+
+def congestion_test():
+    num_players = 2
+    num_actions = [2, 2]
+    game = Game(num_players, num_actions, game_type=Game.CUSTOM, payoff_matrices=[np.array([[-5, -2], [-3, -6]]), np.array([[-5, -3], [-2, -6]])])
+    print("Game type: Congestion")
+    print(game.payoff_matrices)
+    print("Solving with Linear Programming...")
+    distribution, solver = solve_cached(
+        game, lambda g: LinearProgrammingSolver(g, maximize_welfare=True), "lp_welfare"
+    )
+    print(distribution)
+    violations = collect_violations(game, distribution)
+    print("Solving with Swap Regret...")
+    distribution, solver = solve_cached(game, SwapRegretSolver, "sr")
+    print(distribution)
+    violations = collect_violations(game, distribution, epsilon=solver.epsilon)
+    print(violations)
+
+def main():
+    chicken_test()
+    congestion_test()
+
+if __name__ == "__main__":
+    chicken_test()